@@ -1,30 +1,31 @@
-from funct import realizar_calculos, graficar_curvas
+import numpy as np
 
-opcion=input(f"Ingresar curvas:\n 1. Ingresar curvas \n 2. Calcular regresión: \n Otro: salir\n")
-
-match opcion:
-    case "1":
-        #valores de la demanda
-        valores_P=[4,5,6,7,8,9]
-        valores_Q=[135,104,81,68,53,39]
-        b0d, b1d= realizar_calculos(valores_P, valores_Q, len(valores_P))
-        #valores de la oferta
-        valores_P=[4,5,6,7,8,9]
-        valores_Q=[26,53,81,98,110,121]
-        b0s, b1s=realizar_calculos(valores_P, valores_Q, len(valores_P))
-        print(f'valores demanda: {b0d,b1d}')
-        print(f'valores oferta: {b0s,b1s}')
-        graficar_curvas(b0d, b1d, b0s, b1s)  
+from funct import realizar_calculos_lote, graficar_curvas
 
+valores_P=np.array([4,5,6,7,8,9], dtype=np.float64)
+#valores de la demanda
+valores_Qd=np.array([135,104,81,68,53,39], dtype=np.float64)
+#valores de la oferta
+valores_Qs=np.array([26,53,81,98,110,121], dtype=np.float64)
 
-    case "2":
-        b0d=15000
-        b1d=-2500
-        b0s=2000
-        b1s=7500
-        graficar_curvas(b0d, b1d, b0s, b1s)
-    case _:
-        exit()
+def ajustar_y_graficar():
+    b0, b1=realizar_calculos_lote(valores_P, valores_Qd, valores_Qs)
+    (b0d, b0s), (b1d, b1s)=b0.tolist(), b1.tolist()
+    print(f'valores demanda: {b0d,b1d}')
+    print(f'valores oferta: {b0s,b1s}')
+    graficar_curvas(b0d, b1d, b0s, b1s)
 
+def graficar_predeterminado():
+    b0d=15000
+    b1d=-2500
+    b0s=2000
+    b1s=7500
+    graficar_curvas(b0d, b1d, b0s, b1s)
 
+OPCIONES={
+    "1": ajustar_y_graficar,
+    "2": graficar_predeterminado,
+}
 
+opcion=input(f"Ingresar curvas:\n 1. Ingresar curvas \n 2. Calcular regresión: \n Otro: salir\n")
+OPCIONES.get(opcion, exit)()
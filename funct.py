@@ -1,101 +1,268 @@
-import matplotlib.pyplot as plt
+import os
+from collections import namedtuple
+from functools import lru_cache
+
 import numpy as np
-import matplotlib.ticker as ticker
-
-def calcular_sumatorias(variable_independiente, variable_dependiente, registros):
-    suma_x = sum(variable_independiente)
-    suma_y = sum(variable_dependiente)
-    suma_x2 = sum([x**2 for x in variable_independiente])
-    suma_y2 = sum([y**2 for y in variable_dependiente])
-    suma_xy = sum([variable_independiente[i] * variable_dependiente[i] for i in range(registros)])
-    return suma_x, suma_y, suma_x2, suma_xy, suma_y2
-
-# Función para calcular b1 (pendiente)
-def calcular_b1(suma_x, suma_y, suma_x2, suma_xy, registros):
-    b1 = (suma_xy - ((suma_x * suma_y) / registros)) / (suma_x2 - (suma_x**2) / registros)
-    return b1
-
-# Función para calcular b0 (intercepto)
-def calcular_b0(suma_x, suma_y, b1, registros):
-    b0 = (1/registros) * (suma_y - (b1 * suma_x))
-    return b0
-
-def realizar_calculos(valores_q, valores_p, n):
-    suma_x, suma_y, suma_x2, suma_xy, suma_y2=calcular_sumatorias(valores_q, valores_p, n)
-    b1=calcular_b1(suma_x, suma_y, suma_x2, suma_xy, n)
-    b0=calcular_b0(suma_x, suma_y, b1, n)
+
+# Con HEADLESS definido se grafica sin pyplot ni ventana, útil para lotes
+HEADLESS = bool(os.environ.get("HEADLESS"))
+
+# Rejilla de precios en [0, 1]; cada gráfica la escala a su rango en vez de recalcular linspace.
+# Los datos de la gráfica van en float32, la precisión con la que matplotlib los dibuja
+_P_UNITARIO = np.linspace(0.0, 1.0, 100, dtype=np.float32)
+# Buffers de la gráfica reutilizados en cada llamada. Es seguro porque la figura también se
+# reutiliza y se limpia; no es seguro usar graficar_curvas desde varios hilos a la vez
+_P_BUF = np.empty_like(_P_UNITARIO)
+_Q_BUF = np.empty((_P_UNITARIO.size, 2), dtype=np.float32)
+
+def realizar_calculos(valores_q, valores_p):
+    # Si recibe arreglos float64 contiguos, asarray y ascontiguousarray devuelven el mismo
+    # arreglo sin copiarlo; listas u otros tipos sí se convierten. (realizar_calculos_lote,
+    # que es lo que usa analisis.py, siempre copia al apilar las series con column_stack)
+    x = np.asarray(valores_q, dtype=np.float64)
+    y = np.asarray(valores_p, dtype=np.float64)
+    if x.ndim != 1:
+        raise ValueError("Las variables independiente y dependiente deben ser listas o arreglos de una dimensión")
+    if x.shape != y.shape:
+        raise ValueError("Las variables independiente y dependiente deben tener la misma cantidad de registros")
+    if x.size < 2:
+        raise ValueError("Se necesitan al menos dos registros para calcular la regresión")
+    ajustar_recta_jit = _obtener_ajuste_jit()
+    if ajustar_recta_jit is not False:
+        return ajustar_recta_jit(np.ascontiguousarray(x), np.ascontiguousarray(y))
+    # Forma centrada en las medias: evita la cancelación de suma_x2 - suma_x**2/n
+    media_x = x.mean()
+    media_y = y.mean()
+    dx = x - media_x
+    sxx = dx @ dx
+    if sxx == 0:
+        raise ValueError("La variable independiente no varía; no se puede calcular la pendiente")
+    b1 = (dx @ (y - media_y)) / sxx
+    b0 = media_y - b1 * media_x
     return b0, b1
 
+# Ajusta varias series que comparten la variable independiente con una sola llamada a LAPACK
+def realizar_calculos_lote(valores_x, *series_y):
+    if not series_y:
+        raise ValueError("Se necesita al menos una serie de la variable dependiente para calcular la regresión")
+    x = np.asarray(valores_x, dtype=np.float64)
+    series_y = [np.asarray(y, dtype=np.float64) for y in series_y]
+    if any(y.shape != x.shape for y in series_y):
+        raise ValueError("Las variables independiente y dependiente deben tener la misma cantidad de registros")
+    if x.size < 2:
+        raise ValueError("Se necesitan al menos dos registros para calcular la regresión")
+    Y = np.column_stack(series_y)
+    X = np.column_stack([np.ones(x.size), x])
+    coeficientes, _, rango, _ = np.linalg.lstsq(X, Y, rcond=None)
+    # lstsq no falla si x es constante: devuelve la solución de norma mínima
+    if rango < 2:
+        raise ValueError("La variable independiente no varía; no se puede calcular la pendiente")
+    # Fila 0: interceptos (b0), fila 1: pendientes (b1), una columna por serie
+    return coeficientes[0], coeficientes[1]
 
+# Núcleo de la regresión en forma centrada (dos recorridos) que numba compila a código nativo
+def _ajustar_recta(x, y):
+    n = x.size
+    suma_x = 0.0
+    suma_y = 0.0
+    for i in range(n):
+        suma_x += x[i]
+        suma_y += y[i]
+    media_x = suma_x / n
+    media_y = suma_y / n
+    sxx = 0.0
+    sxy = 0.0
+    for i in range(n):
+        dx = x[i] - media_x
+        sxx += dx * dx
+        sxy += dx * (y[i] - media_y)
+    if sxx == 0.0:
+        raise ValueError("La variable independiente no varía; no se puede calcular la pendiente")
+    b1 = sxy / sxx
+    b0 = media_y - b1 * media_x
+    return b0, b1
 
-def graficar_curvas(b0d, b1d, b0s, b1s):
+# numba es opcional y, como matplotlib en graficar_curvas, se importa y compila en la primera
+# llamada a realizar_calculos. None: aún no se intentó; False: numba no está instalado
+_ajustar_recta_jit = None
+
+def _obtener_ajuste_jit():
+    global _ajustar_recta_jit
+    if _ajustar_recta_jit is None:
+        try:
+            from numba import njit
+        except ImportError:  # sin numba se usa la ruta de NumPy
+            _ajustar_recta_jit = False
+        else:
+            # Sin fastmath: supone que no hay NaN ni infinitos y la comprobación sxx == 0.0 dejaría de ser fiable
+            _ajustar_recta_jit = njit(cache=True)(_ajustar_recta)
+    return _ajustar_recta_jit
+
+
+
+DatosGrafica = namedtuple('DatosGrafica', [
+    'P_equilibrio', 'Q_equilibrio',
+    'P_d_intercepto', 'Q_d_intercepto',
+    'P_s_intercepto', 'Q_s_intercepto',
+    'ec', 'ep',
+])
+
+_PLANTILLA_RESULTADOS = (
+    "Precio de equilibrio:{P_equilibrio}, Cantidad de equilibrio:{Q_equilibrio}\n"
+    "Excedente del consumidor: {ec}, Excedente del productor: {ep}"
+)
+
+# Precio en el que Q = b0 + b1*P se hace 0; con pendiente nula la recta nunca corta el eje
+# de precios y se devuelve infinito, que _maximo_finito y el scatter descartan
+def _intercepto_precio(b0, b1):
+    if b1 == 0:
+        return float('inf')
+    return -b0 / b1
+
+# Cálculos puros de la gráfica; se memorizan porque un barrido de parámetros repite combinaciones
+@lru_cache(maxsize=128)
+def _calcular_datos_grafica(b0d, b1d, b0s, b1s):
     P_equilibrio, Q_equilibrio = calcular_equilibrio(b0d, b1d, b0s, b1s)
-    print(f"Precio de equilibrio:{P_equilibrio}, Cantidad de equilibrio:{Q_equilibrio}")
     # Calcular interceptos para la curva de demanda
-    P_d_intercepto = -b0d / b1d  # Intercepto con el eje de precios para demanda
+    P_d_intercepto = _intercepto_precio(b0d, b1d)  # Intercepto con el eje de precios para demanda
     Q_d_intercepto = b0d  # Intercepto con el eje de cantidad para demanda
 
     # Calcular interceptos para la curva de oferta
-    P_s_intercepto = -b0s / b1s  # Intercepto con el eje de precios para oferta
+    P_s_intercepto = _intercepto_precio(b0s, b1s)  # Intercepto con el eje de precios para oferta
     Q_s_intercepto = b0s  # Intercepto con el eje de cantidad para oferta
 
     ec,ep=Calcular_excedentes(Q_equilibrio, P_equilibrio, P_d_intercepto, Q_s_intercepto, P_s_intercepto )
-    print(f"Excedente del consumidor: {ec}, Excedente del productor: {ep}")
+    return DatosGrafica(P_equilibrio, Q_equilibrio, P_d_intercepto, Q_d_intercepto,
+                        P_s_intercepto, Q_s_intercepto, ec, ep)
+
+# Devuelve siempre la misma figura (ver _obtener_figura), igual que los buffers _P_BUF/_Q_BUF:
+# la siguiente llamada la limpia y la vuelve a dibujar, así que hay que guardarla (savefig)
+# antes de volver a llamar. Acumular los resultados en una lista deja N veces la última gráfica
+def graficar_curvas(b0d, b1d, b0s, b1s):
+    # matplotlib se importa al graficar para que usar solo la regresión no lo cargue
+    from matplotlib import ticker
+    from matplotlib.lines import Line2D
+
+    datos = _calcular_datos_grafica(b0d, b1d, b0s, b1s)
+    (P_equilibrio, Q_equilibrio, P_d_intercepto, Q_d_intercepto,
+     P_s_intercepto, Q_s_intercepto, ec, ep) = datos
+    print(_PLANTILLA_RESULTADOS.format_map(datos._asdict()))
     # Crear un rango de precios basado en los interceptos
-    P = np.linspace(0, max(P_d_intercepto, P_s_intercepto), 100)
+    max_precio = _maximo_finito(P_d_intercepto, P_s_intercepto, P_equilibrio)
+    max_cantidad = _maximo_finito(Q_d_intercepto, Q_s_intercepto, Q_equilibrio)
+    P = np.multiply(_P_UNITARIO, np.float32(max_precio), out=_P_BUF)
 
-    # Calcular las cantidades usando las ecuaciones de las rectas
-    Q_d = b0d + b1d * P  # Ecuación de la demanda
-    Q_s = b0s + b1s * P  # Ecuación de la oferta
+    # Calcular las cantidades de ambas rectas en una sola operación (columna 0 demanda, columna 1 oferta)
+    interceptos = np.array([b0d, b0s], dtype=np.float32)
+    pendientes = np.array([b1d, b1s], dtype=np.float32)
+    Q = np.multiply(P[:, None], pendientes, out=_Q_BUF)
+    Q += interceptos
+    Q_d = Q[:, 0]  # Ecuación de la demanda
+    Q_s = Q[:, 1]  # Ecuación de la oferta
 
     # Crear la gráfica
-    plt.figure(figsize=(10, 10))
-    plt.plot(Q_d, P, label='Curva de Demanda', color='blue')
-    plt.plot(Q_s, P, label='Curva de Oferta', color='red')
+    figura = _obtener_figura()
+    ax = figura.add_subplot()
+    ax.plot(Q_d, P, label='Curva de Demanda', color='blue')
+    ax.plot(Q_s, P, label='Curva de Oferta', color='red')
 
 
-    # Añadir los puntos de los interceptos
-    plt.scatter([Q_d_intercepto], [0], color='blue', marker='o', label=f'Intercepto Demanda (0, {Q_d_intercepto:.2f})')
-    plt.scatter([0], [P_d_intercepto], color='blue', marker='x', label=f'Intercepto Precio Demanda ({P_d_intercepto:.2f}, 0)')
-    
-    plt.scatter([Q_s_intercepto], [0], color='red', marker='o', label=f'Intercepto Oferta (0, {Q_s_intercepto:.2f})')
-    plt.scatter([0], [P_s_intercepto], color='red', marker='x', label=f'Intercepto Precio Oferta ({P_s_intercepto:.2f}, 0)')
+    # Formatear de una vez todos los valores que aparecen en la leyenda
+    q_d_txt, p_d_txt, q_s_txt, p_s_txt, p_eq_txt, q_eq_txt = np.char.mod('%.2f', np.array(
+        [Q_d_intercepto, P_d_intercepto, Q_s_intercepto, P_s_intercepto, P_equilibrio, Q_equilibrio],
+        dtype=np.float64)).tolist()
 
     # Si se ha calculado el punto de equilibrio, añadirlo a la gráfica
-    if P_equilibrio is not None and Q_equilibrio is not None:
+    if np.isfinite(P_equilibrio):
         # Dibujar las líneas vertical y horizontal en el punto de equilibrio
-        plt.axhline(P_equilibrio, color='green', linestyle='--', label=f'Equilibrio Precio (P={P_equilibrio:.2f})')
-        plt.axvline(Q_equilibrio, color='green', linestyle='--', label=f'Equilibrio Cantidad (Q={Q_equilibrio:.2f})')
+        ax.axhline(P_equilibrio, color='green', linestyle='--', label=f'Equilibrio Precio (P={p_eq_txt})')
+        ax.axvline(Q_equilibrio, color='green', linestyle='--', label=f'Equilibrio Cantidad (Q={q_eq_txt})')
+
+    # Añadir los puntos de los interceptos y el de equilibrio con un solo scatter por marcador
+    puntos_x = np.array([Q_d_intercepto, 0, Q_s_intercepto, 0, Q_equilibrio], dtype=np.float64)
+    puntos_y = np.array([0, P_d_intercepto, 0, P_s_intercepto, P_equilibrio], dtype=np.float64)
+    colores = np.array(['blue', 'blue', 'red', 'red', 'green'])
+    marcadores = np.array(['o', 'x', 'o', 'x', 'o'])
+    etiquetas = [
+        f'Intercepto Demanda (0, {q_d_txt})',
+        f'Intercepto Precio Demanda ({p_d_txt}, 0)',
+        f'Intercepto Oferta (0, {q_s_txt})',
+        f'Intercepto Precio Oferta ({p_s_txt}, 0)',
+        f'Punto de Equilibrio ({p_eq_txt}, {q_eq_txt})',
+    ]
+    visibles = np.isfinite(puntos_x) & np.isfinite(puntos_y)
+    for marcador in ('o', 'x'):
+        seleccion = visibles & (marcadores == marcador)
+        ax.scatter(puntos_x[seleccion], puntos_y[seleccion], c=colores[seleccion], marker=marcador)
 
-        # Añadir el punto de equilibrio
-        plt.scatter([Q_equilibrio], [P_equilibrio], color='green', marker='o', label=f'Punto de Equilibrio ({P_equilibrio:.2f}, {Q_equilibrio:.2f})')
+    # Entradas de leyenda para cada punto, ya que un mismo scatter agrupa varios
+    leyenda_puntos = [
+        Line2D([], [], color=color, marker=marcador, linestyle='None', label=etiqueta)
+        for color, marcador, etiqueta, visible in zip(colores, marcadores, etiquetas, visibles)
+        if visible
+    ]
 
     # Configuración de la gráfica
-    plt.title('Curvas de Oferta y Demanda con Interceptos y Punto de Equilibrio')
-    plt.xlabel('Precio (P)')
-    plt.ylabel('Cantidad (Q)')
-    plt.axhline(0, color='red', lw=0.5, ls='--')  # Eje horizontal
-    plt.axvline(0, color='red', lw=0.5, ls='--')  # Eje vertical
-    plt.legend()
-    plt.grid(True)
+    ax.set_title('Curvas de Oferta y Demanda con Interceptos y Punto de Equilibrio')
+    ax.set_xlabel('Precio (P)')
+    ax.set_ylabel('Cantidad (Q)')
+    ax.axhline(0, color='red', lw=0.5, ls='--')  # Eje horizontal
+    ax.axvline(0, color='red', lw=0.5, ls='--')  # Eje vertical
+    ax.legend(handles=ax.get_legend_handles_labels()[0] + leyenda_puntos)
+    ax.grid(True)
 
     # Ajustar los límites de los ejes para que muestren todos los puntos relevantes
-    plt.xlim(0, max(Q_d_intercepto, Q_s_intercepto, Q_equilibrio) * 1.1)  # Ajuste del eje de cantidades
-    plt.ylim(0, max(P_d_intercepto, P_s_intercepto, P_equilibrio) * 1.1)  # Ajuste del eje de precios
+    ax.set_xlim(0, max_cantidad * 1.1)  # Ajuste del eje de cantidades
+    ax.set_ylim(0, max_precio * 1.1)  # Ajuste del eje de precios
 
-    tick_interval_x = (plt.xlim()[1] - plt.xlim()[0]) / 15  # Establecer un intervalo basado en el rango de Q
-    tick_interval_y = (plt.ylim()[1] - plt.ylim()[0]) / 15  # Establecer un intervalo basado en el rango de P
+    tick_interval_x = (ax.get_xlim()[1] - ax.get_xlim()[0]) / 15  # Establecer un intervalo basado en el rango de Q
+    tick_interval_y = (ax.get_ylim()[1] - ax.get_ylim()[0]) / 15  # Establecer un intervalo basado en el rango de P
 
-    plt.gca().xaxis.set_major_locator(ticker.MultipleLocator(tick_interval_x))  # Ajusta el intervalo de los ticks del eje x
-    plt.gca().yaxis.set_major_locator(ticker.MultipleLocator(tick_interval_y))  # Ajusta el intervalo de los ticks del eje y
+    ax.xaxis.set_major_locator(ticker.MultipleLocator(tick_interval_x))  # Ajusta el intervalo de los ticks del eje x
+    ax.yaxis.set_major_locator(ticker.MultipleLocator(tick_interval_y))  # Ajusta el intervalo de los ticks del eje y
 
     
     # Mostrar la gráfica
-    plt.show()
+    if not HEADLESS:
+        import matplotlib.pyplot as plt
+        plt.show()
+    return figura
+
+# Máximo ignorando infinitos y NaN (pendiente nula o curvas paralelas). Si ninguno es finito
+# y positivo devuelve 1.0, para que los ejes nunca queden con rango 0 (MultipleLocator(0) falla)
+def _maximo_finito(*valores):
+    valores = np.array(valores, dtype=np.float64)
+    valores = valores[np.isfinite(valores)]
+    maximo = valores.max() if valores.size else 0.0
+    return maximo if maximo > 0 else 1.0
+
+# Figura reutilizada entre llamadas. En modo HEADLESS se crea con matplotlib.figure.Figure,
+# sin pyplot: no queda registrada en su estado global ni se inicia un backend interactivo
+_figura_headless = None
+
+def _obtener_figura():
+    global _figura_headless
+    if not HEADLESS:
+        import matplotlib.pyplot as plt
+        return plt.figure('Oferta y Demanda', figsize=(10, 10), clear=True)
+    if _figura_headless is None:
+        from matplotlib.figure import Figure
+        _figura_headless = Figure(figsize=(10, 10))
+    else:
+        _figura_headless.clear()
+    return _figura_headless
 
 def calcular_equilibrio(b0d, b1d, b0s, b1s):
+    P_equilibrio, Q_equilibrio = calcular_equilibrio_lote(b0d, b1d, b0s, b1s)
+    return float(P_equilibrio), float(Q_equilibrio)
+
+# Equilibrio para arreglos de coeficientes en una sola expresión; NaN donde las curvas son paralelas
+def calcular_equilibrio_lote(b0d, b1d, b0s, b1s):
+    b0d, b1d, b0s, b1s = (np.asarray(c, dtype=np.float64) for c in (b0d, b1d, b0s, b1s))
+    diferencia = b1d - b1s
+    paralelas = np.abs(diferencia) < 1e-10
     # Cálculo del precio y cantidad de equilibrio
-    P_equilibrio = (b0s - b0d) / (b1d - b1s)
+    P_equilibrio = np.where(paralelas, np.nan, (b0s - b0d) / np.where(paralelas, 1.0, diferencia))
     Q_equilibrio = b0d + b1d * P_equilibrio
     return P_equilibrio, Q_equilibrio
 
@@ -105,5 +272,5 @@ def Calcular_excedentes(Q_eq, P_eq, P_d_int, Q_s_int, P_s_int ):
     if Q_s_int>0:
         ep=((Q_eq+Q_s_int)*P_eq)/2
     else:
-        ep=(Q_eq(P_eq-P_s_int))/2
+        ep=0.5*Q_eq*(P_eq-P_s_int)
     return ec,ep
\ No newline at end of file